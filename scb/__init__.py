@@ -9,9 +9,11 @@ from .scb import (
     get_variables,
     get_codelist,
     get_all_data,
+    get_all_data_async,
     set_base_url,
     set_database,
     set_default_lang,
+    clear_caches,
 )
 
 __all__ = [
@@ -23,9 +25,9 @@ __all__ = [
     "get_variables",
     "get_codelist",
     "get_all_data",
+    "get_all_data_async",
     "set_base_url",
     "set_database",
     "set_default_lang",
+    "clear_caches",
 ]
-# Automatically load the configuration upon importing
-get_config()
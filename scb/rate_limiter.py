@@ -0,0 +1,43 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class RateLimiter:
+    """Rate limiter that bounds concurrency and spaces out request starts.
+
+    Args:
+        interval (float): The minimum number of seconds between request starts.
+        concurrency_limit (int): The maximum number of requests in flight at once.
+    """
+
+    def __init__(self, interval: float, concurrency_limit: int):
+        self.interval = interval
+        self.semaphore = asyncio.Semaphore(concurrency_limit)
+        self.lock = asyncio.Lock()
+        self._next_slot = None
+
+    async def wait_for_interval(self) -> None:
+        """Wait until at least `interval` seconds have passed since the last request start.
+
+        Each caller claims the next free start slot under the lock and then
+        sleeps until its own slot outside of it, so waiters sleep in parallel
+        instead of queueing behind one another.
+        """
+        loop = asyncio.get_running_loop()
+        async with self.lock:
+            now = loop.time()
+            if self._next_slot is None or self._next_slot < now:
+                slot = now
+            else:
+                slot = self._next_slot
+            self._next_slot = slot + self.interval
+        wait_time = slot - loop.time()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+    @asynccontextmanager
+    async def throttle(self):
+        """Context manager limiting both concurrency and request rate."""
+        async with self.semaphore:
+            await self.wait_for_interval()
+            yield
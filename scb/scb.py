@@ -1,16 +1,73 @@
+import asyncio
+import functools
+import os
+import queue
+import threading
 import time
-import csv
-from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from itertools import product as iter_product
 import math
 
-
-SESSION = requests.Session()
+from .rate_limiter import RateLimiter
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+import json
+
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+
+# With SCB_CACHE_DIR set (and requests-cache installed), idempotent GETs
+# (config, navigation, metadata, codelists) are cached on disk across
+# sessions; data POSTs always go to the network.
+_CACHE_DIR = os.environ.get("SCB_CACHE_DIR")
+if _CACHE_DIR and requests_cache is not None:
+    SESSION = requests_cache.CachedSession(
+        os.path.join(_CACHE_DIR, "scb_http_cache"),
+        backend="sqlite",
+        expire_after=86400,
+        allowable_methods=("GET",),
+    )
+else:
+    SESSION = requests.Session()
+# Keep connections alive and retry transient failures; the default pool
+# size (10) is too small once get_all_data issues many batch requests.
+_POOL_SIZE = 32
+_ADAPTER = HTTPAdapter(
+    pool_connections=_POOL_SIZE,
+    pool_maxsize=_POOL_SIZE,
+    # The data endpoint is a POST but its queries are pure reads, so POSTs
+    # are safe to retry; Retry honors Retry-After on 429s by default.
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "POST"),
+    ),
+)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+# Compression and keep-alive are left to requests' default headers, which
+# only advertise encodings urllib3 can actually decode (br needs brotli).
 BASE_URL = "https://api.scb.se/ov0104/v2beta/api/v2"
 DEFAULT_LANG = None
 DEFAULT_FORMAT = "csv2"  # Default format for data response
 CONFIG = None
+# Guards lazy CONFIG init/reset now that fetches run from worker threads
+_CONFIG_LOCK = threading.Lock()
 PAGE_SIZE = 10000
 
 
@@ -19,34 +76,74 @@ URL_SHORTCUTS = {
     "ssb": "https://data.ssb.no/api/pxwebapi/v2-beta",
 }
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _json_loads(data: bytes | str):
+    """Parse JSON with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
-def _combine_csv_strings(csv_strings: list[str]) -> str:
-    output = []
-    for i, csv_string in enumerate(csv_strings):
-        reader = csv.reader(StringIO(csv_string))
-        if i == 0:
-            output.extend(reader)
-        else:
-            output.extend(row for j, row in enumerate(reader) if j > 0)
 
-    result = StringIO()
-    writer = csv.writer(result)
-    writer.writerows(output)
-    return result.getvalue()
+def _json_dumps(obj) -> bytes:
+    """Serialize to JSON bytes with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
 
 
+def _prepare_csv_chunk(
+    csv_chunk: bytes, is_first: bool, previous_ended_with_newline: bool
+) -> tuple[bytes, bool]:
+    """Prepare one CSV chunk for appending after previously emitted chunks.
+
+    The chunks all share one schema, so there is no need to parse (or even
+    decode) them; every chunk after the first has everything up to and
+    including its first newline dropped, and gets a separating newline
+    prepended when the previous output did not end with one.
+
+    Returns the bytes to append (possibly empty) and whether the emitted
+    output ends with a newline afterwards, so callers can thread that flag
+    through to the next chunk.
+    """
+    if not is_first:
+        newline = csv_chunk.find(b"\n")
+        if newline == -1:
+            return b"", previous_ended_with_newline
+        csv_chunk = csv_chunk[newline + 1 :]
+    if not csv_chunk:
+        return b"", previous_ended_with_newline
+    if not is_first and not previous_ended_with_newline:
+        csv_chunk = b"\n" + csv_chunk
+    return csv_chunk, csv_chunk.endswith(b"\n")
+
+
+def _combine_csv_chunks(csv_chunks: list[bytes]) -> bytes:
+    """Concatenate CSV chunks, keeping only the first chunk's header line."""
+    parts = []
+    ended_with_newline = True
+    for i, csv_chunk in enumerate(csv_chunks):
+        part, ended_with_newline = _prepare_csv_chunk(
+            csv_chunk, i == 0, ended_with_newline
+        )
+        parts.append(part)
+    return b"".join(parts)
+
+
+# Deletes spaces and tabs in a single C-level pass.
+_SIMPLIFY_TABLE = str.maketrans("", "", " \t")
+
+
+@functools.lru_cache(maxsize=4096)
 def _simplify_string(string: str) -> str:
     """Simplify a string by stripping, removing spaces, and lowercasing."""
-    return string.strip().replace(" ", "").lower()
+    return string.translate(_SIMPLIFY_TABLE).strip().lower()
 
 
-def _compare_strings(string: str, *args: str) -> bool:
-    """Returns True if the string is equal to any of the given arguments."""
-    simple_string = _simplify_string(string)
-    for arg in args:
-        if simple_string == _simplify_string(arg):
-            return True
-    return False
+def _ceildiv(a: int, b: int) -> int:
+    """Integer ceiling division; exact for large ints, unlike math.ceil(a / b)."""
+    return -(-a // b)
 
 
 def _save_csv(data: str, file_name: str) -> None:
@@ -55,28 +152,107 @@ def _save_csv(data: str, file_name: str) -> None:
         file.write(data)
 
 
-def _get_partition_data(variables: dict, limit: int) -> tuple[dict, list]:
-    """Get the number of batches and batch sizes for each variable.
+@functools.lru_cache(maxsize=1024)
+def _get_partition_data(lengths: tuple, limit: int) -> tuple:
+    """Get the number of batches and batch sizes for each variable length.
+
+    Keyed on value counts rather than the variables themselves, since the
+    partitioning only depends on how many values each variable has.
+
     Args:
-        variables (dict): A dictionary of variable names to lists of values.
+        lengths (tuple): The number of values per variable, by position.
         limit (int): The maximum number of rows to request.
     Returns:
-        tuple: A dictionary of variable names to optimal batch sizes and a list of unique numbers of batches.
+        tuple: Two parallel structures: per-position tuples of the distinct
+        batch counts (ascending) and per-position tuples of the matching
+        largest batch sizes. Parallel tuples keep the solver's inner loop on
+        integer indexing instead of dict hashing.
     """
-    batch_size_sets = {}
-    number_of_batches_lists = []
-    for var, values in variables.items():
-        size_to_batches = {}
+    batch_counts = []
+    batch_sizes = []
+    for n in lengths:
+        counts = []
+        sizes = []
+
+        # ceil(n / size) only takes O(sqrt(n)) distinct values, so instead of
+        # trying every size we jump straight from one distinct batch count to
+        # the next, recording the largest size for each count
+        # (since we want to minimize the number of requests). Walking the
+        # sizes downward yields the counts in ascending order.
+        size = min(n, limit)
+        while size >= 1:
+            nbr_of_batches = _ceildiv(n, size)
+            counts.append(nbr_of_batches)
+            sizes.append(size)
+            size = _ceildiv(n, nbr_of_batches) - 1
+        batch_counts.append(tuple(counts))
+        batch_sizes.append(tuple(sizes))
+
+    return tuple(batch_counts), tuple(batch_sizes)
+
+
+@functools.lru_cache(maxsize=1024)
+def _solve_optimal(lengths: tuple, limit: int) -> tuple:
+    """Find the optimal batch sizes for variables of the given lengths.
+
+    The solution depends only on the value counts and the limit, so it is
+    memoized on exactly those (see _find_optimal_combination for the named view).
 
-        for size in range(1, min(len(values) + 1, limit + 1)):
-            nbr_of_batches = math.ceil(len(values) / size)
-            # This ensures we only keep the largest size for each unique number of batches
-            # (since we want to minimize the number of requests)
-            size_to_batches[nbr_of_batches] = size
-        batch_size_sets[var] = size_to_batches
-        number_of_batches_lists.append(list(size_to_batches.keys()))
+    Args:
+        lengths (tuple): The number of values per variable, by position.
+        limit (int): The maximum number of rows to request.
+    Returns:
+        tuple: The optimal batch size per variable, by position.
+    """
+    total_rows = math.prod(lengths)
+    lower_request_bound = _ceildiv(total_rows, limit)
+    if lower_request_bound == 1:
+        return lengths
+
+    batch_counts, batch_sizes = _get_partition_data(lengths, limit)
 
-    return batch_size_sets, number_of_batches_lists
+    n_vars = len(lengths)
+
+    # Product of the smallest batch counts over the remaining variables: a
+    # lower bound on how much any completion must multiply the request count.
+    # The counts come out of _get_partition_data ascending, which also lets
+    # each level break as soon as the partial request count can no longer
+    # beat the best combination found so far.
+    min_remaining = [1] * (n_vars + 1)
+    for idx in range(n_vars - 1, -1, -1):
+        min_remaining[idx] = min_remaining[idx + 1] * batch_counts[idx][0]
+
+    best_combination = None
+    min_request_count = float("inf")
+    chosen = [0] * n_vars
+
+    def _search(idx: int, request_count: int, batch_product: int) -> bool:
+        """Depth-first search carrying running products; returns True once the
+        lower bound is reached (no better combination can exist)."""
+        nonlocal best_combination, min_request_count
+        if idx == n_vars:
+            min_request_count = request_count
+            best_combination = tuple(chosen)
+            return request_count == lower_request_bound
+        level_counts = batch_counts[idx]
+        level_sizes = batch_sizes[idx]
+        bound = min_remaining[idx + 1]
+        for i, nbr in enumerate(level_counts):
+            new_request_count = request_count * nbr
+            if new_request_count * bound >= min_request_count:
+                break
+            new_batch_product = batch_product * level_sizes[i]
+            if new_batch_product > limit:
+                # Larger batch counts mean smaller batches, so keep scanning.
+                continue
+            chosen[idx] = level_sizes[i]
+            if _search(idx + 1, new_request_count, new_batch_product):
+                return True
+        return False
+
+    _search(0, 1, 1)
+
+    return best_combination
 
 
 def _find_optimal_combination(variables: dict, limit: int) -> dict:
@@ -87,36 +263,13 @@ def _find_optimal_combination(variables: dict, limit: int) -> dict:
     Returns:
         dict: A dictionary of variable names to optimal batch sizes.
     """
-    total_rows = math.prod([len(values) for values in variables.values()])
-    lower_request_bound = math.ceil(total_rows / limit)
-    if lower_request_bound == 1:
-        return {var: len(values) for var, values in variables.items()}
-
-    batch_size_sets, number_of_batches_lists = _get_partition_data(variables, limit)
-
-    best_combination = None
-    min_request_count = float("inf")
-
-    for combo in iter_product(*number_of_batches_lists):
-        request_count = math.prod(combo)
-        if request_count >= lower_request_bound and request_count < min_request_count:
-            batch_sizes_product = math.prod(
-                [batch_size_sets[var][nbr] for var, nbr in zip(variables.keys(), combo)]
-            )
-            if batch_sizes_product <= limit:
-                min_request_count = request_count
-                best_combination = combo
-                if min_request_count == lower_request_bound:
-                    break
-    return {
-        var: batch_size_sets[var][nbr]
-        for var, nbr in zip(variables.keys(), best_combination)
-    }
+    lengths = tuple(len(values) for values in variables.values())
+    return dict(zip(variables.keys(), _solve_optimal(lengths, limit)))
 
 
 def _split_into_batches(values, batch_size):
     """Split values into batches of up to batch_size, with the last batch potentially smaller."""
-    nbr_of_lists = math.ceil(len(values) / batch_size)
+    nbr_of_lists = _ceildiv(len(values), batch_size)
     batches = [
         values[i * batch_size : (i + 1) * batch_size] for i in range(nbr_of_lists)
     ]
@@ -124,24 +277,16 @@ def _split_into_batches(values, batch_size):
 
 
 def _generate_all_combinations(variables, optimal_batch_sizes):
-    """Generate all combinations of batches, one batch from each variable's batched lists of values."""
+    """Yield all combinations of batches, one batch from each variable's batched lists of values."""
     # Split each variable's values into batches according to the optimal batch size
-    all_batches = {
-        var: _split_into_batches(values, optimal_batch_sizes[var])
+    var_names = tuple(variables.keys())
+    batches_per_var = [
+        _split_into_batches(values, optimal_batch_sizes[var])
         for var, values in variables.items()
-    }
-    # Generate the Cartesian product of all batches to form the configurations
-    configurations = list(iter_product(*all_batches.values()))
-
-    # Convert tuple configurations to dictionary format
-    configurations_dicts = []
-    for configuration in configurations:
-        config_dict = {
-            var: batch for var, batch in zip(variables.keys(), configuration)
-        }
-        configurations_dicts.append(config_dict)
-
-    return configurations_dicts
+    ]
+    # Walk the Cartesian product lazily; nothing is materialized until consumed
+    for configuration in iter_product(*batches_per_var):
+        yield dict(zip(var_names, configuration))
 
 
 def _get_request_configs(
@@ -163,47 +308,70 @@ def _get_request_configs(
     return request_configs
 
 
-def _construct_query(request_config: dict) -> dict:
-    """
-    Helper function for constructing a payload for a given table using the request_config and response_format.
-    Meant only for pxweb based api's.
+def _get_simple_variables(table_id: str, lang: str = None) -> dict:
+    """Map a table's variable ids to their lists of value codes."""
+    variables = get_variables(table_id, lang)
+    return {
+        variable["id"]: [value["code"] for value in variable["values"]]
+        for variable in variables
+    }
 
-    Args:
-    - request_config: The configuration for the request.
 
-    Returns:
-    - A dictionary representing the payload.
+def _get_queries(variables: dict, limit: int):
+    """Yield all queries for a given set of variables and a limit on the number of rows.
+    Args:
+        variables (dict): A dictionary of variable names to lists of values.
+        limit (int): The maximum number of rows to request.
+    Yields:
+        dict: Dictionaries representing the payloads, one per request config.
     """
+    # Stringify value codes once up front; the batches below are slices of
+    # these lists, so no per-query conversion is needed.
+    variables = {
+        var: [value if isinstance(value, str) else str(value) for value in values]
+        for var, values in variables.items()
+    }
 
-    payload = {"selection": []}
+    # The common small-table case fits in a single request; skip the solver
+    # and batching machinery entirely.
+    total_rows = math.prod(len(values) for values in variables.values())
+    if total_rows <= limit:
+        yield {
+            "selection": [
+                {"variableCode": code, "valueCodes": values}
+                for code, values in variables.items()
+            ]
+        }
+        return
+
+    for request_config in _get_request_configs(variables, limit):
+        yield {
+            "selection": [
+                {"variableCode": code, "valueCodes": values}
+                for code, values in request_config.items()
+            ]
+        }
 
-    for code, values in request_config.items():
-        payload["selection"].append(
-            {
-                "variableCode": code,
-                "valueCodes": [str(value) for value in values],
-            }
-        )
-    return payload
 
+def clear_caches() -> None:
+    """Clear all memoized API responses.
 
-def _get_queries(variables: dict, limit: int) -> list[dict]:
-    """Get all possible queries for a given set of variables and a limit on the number of rows.
-    Args:
-        variables (dict): A dictionary of variable names to lists of values.
-        limit (int): The maximum number of rows to request.
-    Returns:
-        list: A list of dictionaries representing the payloads.
+    Called automatically when the base URL or default language changes;
+    users can also call it to force fresh metadata within a session.
     """
-    request_configs = _get_request_configs(variables, limit)
-    return [_construct_query(config) for config in request_configs]
+    _get_metadata_cached.cache_clear()
+    get_codelist.cache_clear()
+    _get_valid_languages.cache_clear()
+    _get_valid_formats.cache_clear()
 
 
 def set_base_url(url: str) -> None:
     """Set the base URL for the module to use."""
-    global BASE_URL
-    BASE_URL = url
-    get_config(override=True)
+    global BASE_URL, CONFIG
+    with _CONFIG_LOCK:
+        BASE_URL = url
+        CONFIG = None  # Re-fetched lazily on next use
+    clear_caches()
 
 
 def set_database(database: str) -> None:
@@ -215,9 +383,11 @@ def set_database(database: str) -> None:
         raise ValueError(
             f"Invalid database: {database}. Valid databases are {URL_SHORTCUTS.keys()}"
         )
-    global BASE_URL
-    BASE_URL = URL_SHORTCUTS[database]
-    get_config(override=True)
+    global BASE_URL, CONFIG
+    with _CONFIG_LOCK:
+        BASE_URL = URL_SHORTCUTS[database]
+        CONFIG = None  # Re-fetched lazily on next use
+    clear_caches()
 
 
 def set_default_lang(lang: str) -> None:
@@ -227,11 +397,13 @@ def set_default_lang(lang: str) -> None:
     if lang not in valid_langs:
         raise ValueError(f"Invalid language: {lang}. Valid languages are {valid_langs}")
     DEFAULT_LANG = lang
+    clear_caches()
 
 
 # {"languages": [{"id": "sv", "label": "Svenska"}, {"id": "en", "label": "English"}]}
 
 
+@functools.lru_cache(maxsize=1)
 def _get_valid_languages() -> list[str]:
     """Get the valid languages for the API."""
     config = get_config()
@@ -239,6 +411,7 @@ def _get_valid_languages() -> list[str]:
     return [lang["id"] for lang in langs]
 
 
+@functools.lru_cache(maxsize=1)
 def _get_valid_formats() -> list[str]:
     """Get the valid data formats for the API."""
     config = get_config()
@@ -272,8 +445,10 @@ def get_config(override: bool = False) -> dict:
     """
     global CONFIG
     if CONFIG is None or override:
-        response = SESSION.get(BASE_URL + "/config")
-        CONFIG = response.json()
+        with _CONFIG_LOCK:
+            if CONFIG is None or override:
+                response = SESSION.get(BASE_URL + "/config")
+                CONFIG = _json_loads(response.content)
     return CONFIG
 
 
@@ -281,7 +456,7 @@ def get_folder(folder_id: str = "", lang: str = None) -> dict:
     """Get the folder information for a specific folder ID."""
     params = _get_language_param(lang)
     response = SESSION.get(f"{BASE_URL}/navigation/{folder_id}", params=params)
-    return response.json()
+    return _json_loads(response.content)
 
 
 def get_tables(
@@ -315,7 +490,7 @@ def get_tables(
     params = {k: v for k, v in params.items() if v is not None}
 
     response = SESSION.get(url, params=params)
-    response_dict = response.json()
+    response_dict = _json_loads(response.content)
     tables = response_dict["tables"]
 
     for table in tables:
@@ -336,13 +511,22 @@ def get_metadata(table_id: str, as_json_stat: bool = True, lang: str = None) ->
         as_json_stat: Whether to return the metadata in JSON-Stat 2 format. Optional.
         lang: The language for the response. Optional. Overrides the default language if set.
     """
+    # Resolve the default language up front so explicit and implicit calls
+    # for the same language share one cache entry.
+    if lang is None:
+        lang = DEFAULT_LANG
+    return _get_metadata_cached(table_id, as_json_stat, lang)
+
+
+@functools.lru_cache(maxsize=256)
+def _get_metadata_cached(table_id: str, as_json_stat: bool, lang: str) -> dict:
     url = f"{BASE_URL}/tables/{table_id}/metadata"
     params = _get_language_param(lang)
     if as_json_stat:
         params["outputFormat"] = "json-stat2"
 
     response = SESSION.get(url, params=params)
-    return response.json()
+    return _json_loads(response.content)
 
 
 def get_variables(table_id: str, lang: str = None) -> dict:
@@ -360,6 +544,7 @@ def get_variables(table_id: str, lang: str = None) -> dict:
     return metadata["variables"]
 
 
+@functools.lru_cache(maxsize=256)
 def get_codelist(codelist_id: str, lang: str = None) -> dict:
     """
     Fetch a codelist by its ID.
@@ -374,7 +559,7 @@ def get_codelist(codelist_id: str, lang: str = None) -> dict:
     url = f"{BASE_URL}/codeLists/{codelist_id}"
     params = _get_language_param(lang)
     response = SESSION.get(url, params=params)
-    return response.json()
+    return _json_loads(response.content)
 
 
 def get_data(table_id: str, format: str = "csv2", lang: str = None, **kwargs):
@@ -395,86 +580,281 @@ def get_data(table_id: str, format: str = "csv2", lang: str = None, **kwargs):
     if format not in valid_formats:
         raise ValueError(f"Invalid format: {format}. Valid formats are {valid_formats}")
 
-    metadata = get_metadata(table_id, lang)
-    variables = metadata["variables"]
+    variables = get_variables(table_id, lang)
     query = {"selection": []}
 
-    for kwarg in kwargs:
-        for variable in variables:
-            # if variable["label"] == kwarg or variable["id"] == kwarg:
-            if _compare_strings(kwarg, variable["label"], variable["id"]):
-                input_values = kwargs[kwarg]
-
-                query["selection"].append(
-                    {
-                        "variableCode": variable["id"],
-                        "valueCodes": [
-                            value["code"]
-                            for value in variable["values"]
-                            if _compare_strings(value["label"], *input_values)
-                            or _compare_strings(value["code"], *input_values)
-                        ],
-                    }
-                )
+    # Index variables by simplified id and label for O(1) kwarg lookup.
+    var_index = {}
+    for variable in variables:
+        var_index[_simplify_string(variable["id"])] = variable
+        var_index[_simplify_string(variable["label"])] = variable
+
+    # Value indexes are built at most once per variable, even when several
+    # kwargs resolve to the same variable.
+    value_indexes = {}
+
+    def _get_value_index(variable: dict) -> dict:
+        value_index = value_indexes.get(variable["id"])
+        if value_index is None:
+            value_index = {}
+            for value in variable["values"]:
+                value_index.setdefault(_simplify_string(value["label"]), value["code"])
+                value_index.setdefault(_simplify_string(value["code"]), value["code"])
+            value_indexes[variable["id"]] = value_index
+        return value_index
+
+    for kwarg, input_values in kwargs.items():
+        variable = var_index.get(_simplify_string(kwarg))
+        if variable is None:
+            continue
+        # Deduplicate while keeping the caller's ordering.
+        simple_inputs = dict.fromkeys(map(_simplify_string, input_values))
+        value_index = _get_value_index(variable)
+
+        query["selection"].append(
+            {
+                "variableCode": variable["id"],
+                "valueCodes": [
+                    value_index[simple_input]
+                    for simple_input in simple_inputs
+                    if simple_input in value_index
+                ],
+            }
+        )
 
     url = f"{BASE_URL}/tables/{table_id}/data"
     params = {**_get_language_param(lang), "outputFormat": format}
-    response = SESSION.post(url, params=params, json=query)
+    response = SESSION.post(
+        url, params=params, data=_json_dumps(query), headers=_JSON_HEADERS
+    )
 
     if "json" in response.headers["Content-Type"]:
-        return response.json()
+        return _json_loads(response.content)
     else:
-        return response.text
+        # The API always serves UTF-8; decoding directly skips requests'
+        # charset detection on every body.
+        return response.content.decode("utf-8")
 
 
-def get_all_data(
+async def get_all_data_async(
     table_id: str,
     format: str = "csv2",
     lang: str = None,
+    file_name: str = None,
 ):
     """
-    Fetch all data for a specific table.
+    Fetch all data for a specific table, issuing the batch requests concurrently.
 
     Args:
         table_id: The ID of the table to fetch data from.
         format: The format for the data response (default is 'csv2').
         lang: The language for the response. Optional. Overrides the default language if set.
+        file_name: If given, stream the combined result to this file instead of
+            returning it, keeping at most a handful of batches in memory.
     """
+    if aiohttp is None:
+        raise ImportError("aiohttp is required for get_all_data_async")
 
     config = get_config()
     valid_formats = config["dataFormats"]
     if format not in valid_formats:
         raise ValueError(f"Invalid format: {format}. Valid formats are {valid_formats}")
 
-    variables = get_variables(table_id, lang)
     limit = config["maxDataCells"]
+    concurrency_limit = config["maxCallsPerTimeWindow"]
     min_request_interval = config["timeWindow"] / config["maxCallsPerTimeWindow"] + 0.1
-    last_request_time = time.time()
 
-    simple_variables = {}
-    for variable in variables:
-        simple_variables[variable["id"]] = [
-            value["code"] for value in variable["values"]
-        ]
+    simple_variables = _get_simple_variables(table_id, lang)
+    queries = _get_queries(simple_variables, limit)
+
+    url = f"{BASE_URL}/tables/{table_id}/data"
+    params = {"lang": lang, "outputFormat": "csv2"}
+    params = {k: v for k, v in params.items() if v is not None}
+
+    limiter = RateLimiter(
+        interval=min_request_interval, concurrency_limit=concurrency_limit
+    )
+
+    connector = aiohttp.TCPConnector(limit=concurrency_limit)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        if file_name is None:
+            results = {}
+
+            async def _fetch(index: int, query: dict) -> None:
+                async with limiter.throttle():
+                    async with session.post(
+                        url,
+                        params=params,
+                        data=_json_dumps(query),
+                        headers=_JSON_HEADERS,
+                    ) as response:
+                        results[index] = await response.read()
+
+            await asyncio.gather(
+                *(_fetch(index, query) for index, query in enumerate(queries))
+            )
+            data = [results[index] for index in range(len(results))]
+        else:
+            # Write batches to the file in submission order as they complete,
+            # so only the out-of-order window is ever held in memory.
+            with open(file_name, "wb") as file:
+                pending = {}
+                next_index = 0
+                ended_with_newline = True
+
+                def _flush() -> None:
+                    nonlocal next_index, ended_with_newline
+                    while next_index in pending:
+                        body = pending.pop(next_index)
+                        if "csv" in format:
+                            body, ended_with_newline = _prepare_csv_chunk(
+                                body, next_index == 0, ended_with_newline
+                            )
+                        file.write(body)
+                        next_index += 1
+
+                async def _fetch_to_file(index: int, query: dict) -> None:
+                    async with limiter.throttle():
+                        async with session.post(
+                            url,
+                            params=params,
+                            data=_json_dumps(query),
+                            headers=_JSON_HEADERS,
+                        ) as response:
+                            pending[index] = await response.read()
+                    _flush()
+
+                await asyncio.gather(
+                    *(_fetch_to_file(index, query) for index, query in enumerate(queries))
+                )
+            return file_name
+
+    if "csv" in format:
+        return _combine_csv_chunks(data).decode("utf-8")
+    else:
+        return [chunk.decode("utf-8") for chunk in data]
+
+
+def _get_all_data_threaded(
+    table_id: str,
+    format: str = "csv2",
+    lang: str = None,
+    file_name: str = None,
+):
+    """Thread-pool implementation of get_all_data, used when aiohttp is unavailable.
 
+    requests releases the GIL during socket I/O, so a pool bounded by the
+    API's call budget gives the same parallelism as the async path.
+    """
+    config = get_config()
+    valid_formats = config["dataFormats"]
+    if format not in valid_formats:
+        raise ValueError(f"Invalid format: {format}. Valid formats are {valid_formats}")
+
+    limit = config["maxDataCells"]
+    # More workers than pooled connections would just serialize on the pool.
+    max_workers = min(config["maxCallsPerTimeWindow"], _POOL_SIZE)
+    min_request_interval = config["timeWindow"] / config["maxCallsPerTimeWindow"] + 0.1
+
+    simple_variables = _get_simple_variables(table_id, lang)
     queries = _get_queries(simple_variables, limit)
 
-    data = []
     url = f"{BASE_URL}/tables/{table_id}/data"
     params = {"lang": lang, "outputFormat": "csv2"}
+    params = {k: v for k, v in params.items() if v is not None}
 
-    data = []
+    # Same next-slot scheme as RateLimiter, but with a threading lock: each
+    # worker claims a start slot under the lock and sleeps outside it.
+    rate_lock = threading.Lock()
+    next_slot = [time.monotonic()]
+
+    def _do_post(query: dict) -> bytes:
+        with rate_lock:
+            slot = max(time.monotonic(), next_slot[0])
+            next_slot[0] = slot + min_request_interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        response = SESSION.post(
+            url, params=params, data=_json_dumps(query), headers=_JSON_HEADERS
+        )
+        return response.content
 
-    for query in queries:
-        current_time = time.time()
-        if current_time - last_request_time < min_request_interval:
-            time.sleep(min_request_interval - (current_time - last_request_time))
-        last_request_time = time.time()
+    if file_name is None:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # executor.map preserves submission order
+            data = list(executor.map(_do_post, queries))
 
-        response = SESSION.post(url, params=params, json=query)
-        data.append(response.text)
+        if "csv" in format:
+            return _combine_csv_chunks(data).decode("utf-8")
+        else:
+            return [chunk.decode("utf-8") for chunk in data]
+
+    # A single writer thread drains completed batches and writes them to the
+    # file in submission order, so memory stays bounded by the out-of-order
+    # window instead of the table size.
+    results_queue = queue.Queue()
+    writer_error = []
+
+    def _write_batches(file) -> None:
+        pending = {}
+        next_index = 0
+        ended_with_newline = True
+        try:
+            while True:
+                item = results_queue.get()
+                if item is None:
+                    break
+                index, body = item
+                pending[index] = body
+                while next_index in pending:
+                    body = pending.pop(next_index)
+                    if "csv" in format:
+                        body, ended_with_newline = _prepare_csv_chunk(
+                            body, next_index == 0, ended_with_newline
+                        )
+                    file.write(body)
+                    next_index += 1
+        except Exception as error:  # re-raised in the calling thread below
+            writer_error.append(error)
+
+    def _post_to_queue(item: tuple) -> None:
+        index, query = item
+        results_queue.put((index, _do_post(query)))
+
+    # The file is opened here rather than in the writer thread so an
+    # unwritable path raises before any requests are made.
+    with open(file_name, "wb") as file:
+        writer = threading.Thread(target=_write_batches, args=(file,))
+        writer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Consume the iterator so worker exceptions propagate
+                list(executor.map(_post_to_queue, enumerate(queries)))
+        finally:
+            results_queue.put(None)
+            writer.join()
+    if writer_error:
+        raise writer_error[0]
+    return file_name
 
-    if "csv" in format:
-        return _combine_csv_strings(data)
-    else:
-        return data
+
+def get_all_data(
+    table_id: str,
+    format: str = "csv2",
+    lang: str = None,
+    file_name: str = None,
+):
+    """
+    Fetch all data for a specific table.
+
+    Args:
+        table_id: The ID of the table to fetch data from.
+        format: The format for the data response (default is 'csv2').
+        lang: The language for the response. Optional. Overrides the default language if set.
+        file_name: If given, stream the combined result to this file instead of
+            returning it.
+    """
+    if aiohttp is None:
+        return _get_all_data_threaded(table_id, format, lang, file_name)
+    return asyncio.run(get_all_data_async(table_id, format, lang, file_name))
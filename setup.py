@@ -44,7 +44,7 @@ setuptools.setup(
     ],
     python_requires=">=3.8",
     # Requirements
-    install_requires=["requests>=2.21.0"],
+    install_requires=["requests>=2.21.0", "orjson>=3.6.0"],
     long_description=Path("README.md").read_text(),
     long_description_content_type="text/markdown",
 )
@@ -9,9 +9,11 @@ from scb import (
     get_variables,
     get_codelist,
     get_all_data,
+    get_all_data_async,
     set_base_url,
     set_database,
     set_default_lang,
+    clear_caches,
 )
 
 set_database("ssb")
@@ -26,9 +28,9 @@ __all__ = [
     "get_variables",
     "get_codelist",
     "get_all_data",
+    "get_all_data_async",
     "set_base_url",
     "set_database",
     "set_default_lang",
+    "clear_caches",
 ]
-# Automatically load the configuration upon importing
-get_config()